@@ -0,0 +1,92 @@
+"""
+Numeric core of the differential drive robot model, compiled with numba when it is available
+The kernels take and return plain floats so they can be called from RobotBasicModel as well as from batch loops,
+the step kernels release the GIL so robots can be stepped from several threads
+"""
+import math
+from math import pi as PI, tau as TAU
+from GameEngine.jit import njit
+
+HALF_PI = PI * 0.5
+QUARTER_PI = PI * 0.25
+THREE_QUARTER_PI = PI * 0.75
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def wrap_angle(angle):
+    """
+    Wrap any angle to the range <-pi, pi), the per step change is small so the angle is mostly already in range
+    """
+    if -PI <= angle < PI:
+        return angle
+    return (angle + PI) % TAU - PI
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def angle_diff(a, b):
+    """
+    Absolute difference of two angles, range <0, pi>, the inputs do not need to be wrapped
+    """
+    d = (a - b + PI) % TAU - PI
+    return -d if d < 0 else d
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def step_kernel(x, y, q, l_motor_speed, r_motor_speed, k_vel, k_lin, k_ang):
+    """
+    Differential drive step, http://roboscience.org/book/html/Simulation/MovingDifferential.html
+    :param x: x coordinate in EFCS
+    :param y: y coordinate in EFCS
+    :param q: pointing angle [rad]
+    :param l_motor_speed: <rad/s> left motor rotation speed
+    :param r_motor_speed: <rad/s> right motor rotation speed
+    :param k_vel: wheel_radius / 2
+    :param k_lin: wheel_radius * dt / 2
+    :param k_ang: wheel_radius * dt / axis_len
+    :return: new x, y, pointing angle and velocity
+    """
+    speed_sum = l_motor_speed + r_motor_speed
+    vel = k_vel * speed_sum
+    k = k_lin * speed_sum
+    xn = x + k * math.cos(q)
+    yn = y + k * math.sin(q)
+    qn = q + k_ang * (l_motor_speed - r_motor_speed)
+    return xn, yn, wrap_angle(qn), vel
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def step_n_kernel(x, y, q, l_motor_speed, r_motor_speed, k_vel, k_lin, k_ang, steps):
+    """
+    Several differential drive steps with constant motor speeds, same result as calling step_kernel in a loop
+    :param steps: number of simulation steps
+    :return: new x, y, pointing angle and velocity
+    """
+    k = k_lin * (l_motor_speed + r_motor_speed)
+    dq = k_ang * (l_motor_speed - r_motor_speed)
+    for _ in range(steps):
+        x += k * math.cos(q)
+        y += k * math.sin(q)
+        q = wrap_angle(q + dq)
+    return x, y, q, k_vel * (l_motor_speed + r_motor_speed)
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def restricted_speeds_kernel(q, angle_of_blockage, restricted_angle, l_motor_speed, r_motor_speed):
+    """
+    Motor speeds after removing the forward/backward component when moving towards the blockage, the robot then
+    turns in place
+    :param q: pointing angle [rad]
+    :param angle_of_blockage: direction of the blockage relative to ego [rad]
+    :param restricted_angle: half width of the blocked sector [rad]
+    :return: left and right motor speeds
+    """
+    vel_simplified = (l_motor_speed + r_motor_speed) / 2
+    if vel_simplified == 0:
+        return l_motor_speed, r_motor_speed
+    # moving backwards is blocked by an obstacle behind the robot, q + PI is wrapped by angle_diff
+    move_pointing_ang = q if vel_simplified > 0 else q + PI
+    if angle_diff(angle_of_blockage, move_pointing_ang) > restricted_angle:
+        return l_motor_speed, r_motor_speed
+    # blocked - only the rotation is kept, l - vel_simplified == (l - r) / 2 == -(r - vel_simplified)
+    diff = (l_motor_speed - r_motor_speed) * 0.5
+    return diff, -diff
@@ -0,0 +1,90 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Compiled robot kernels, build with `python setup.py build_ext --inplace`
+When built, GameEngine.robot_model uses these instead of GameEngine._robot_kernels - keep both implementations in sync
+"""
+cimport cython
+from cython cimport floating
+from libc.math cimport sin, cos, fmod, M_PI
+
+cdef double TAU = 2 * M_PI
+
+
+@cython.cdivision(True)
+cdef inline double _wrap_angle(double angle) noexcept nogil:
+    """
+    Wrap any angle to the range <-pi, pi), same as GameEngine._robot_kernels.wrap_angle
+    """
+    cdef double wrapped
+    if -M_PI <= angle < M_PI:
+        return angle
+    wrapped = fmod(angle + M_PI, TAU)
+    if wrapped < 0:
+        wrapped += TAU
+    return wrapped - M_PI
+
+
+cpdef tuple step_kernel(double x, double y, double q, double l_motor_speed, double r_motor_speed,
+                        double k_vel, double k_lin, double k_ang):
+    """
+    Differential drive step, same as GameEngine._robot_kernels.step_kernel
+    :return: new x, y, pointing angle and velocity
+    """
+    cdef double speed_sum = l_motor_speed + r_motor_speed
+    cdef double k = k_lin * speed_sum
+    return (x + k * cos(q), y + k * sin(q), _wrap_angle(q + k_ang * (l_motor_speed - r_motor_speed)),
+            k_vel * speed_sum)
+
+
+cpdef tuple step_n_kernel(double x, double y, double q, double l_motor_speed, double r_motor_speed,
+                          double k_vel, double k_lin, double k_ang, long steps):
+    """
+    Several differential drive steps with constant motor speeds, same as GameEngine._robot_kernels.step_n_kernel
+    :return: new x, y, pointing angle and velocity
+    """
+    cdef double k = k_lin * (l_motor_speed + r_motor_speed)
+    cdef double dq = k_ang * (l_motor_speed - r_motor_speed)
+    cdef long i
+    for i in range(steps):
+        x += k * cos(q)
+        y += k * sin(q)
+        q = _wrap_angle(q + dq)
+    return x, y, q, k_vel * (l_motor_speed + r_motor_speed)
+
+
+cpdef tuple restricted_speeds_kernel(double q, double angle_of_blockage, double restricted_angle,
+                                     double l_motor_speed, double r_motor_speed):
+    """
+    Motor speeds after removing the forward/backward component when moving towards the blockage,
+    same as GameEngine._robot_kernels.restricted_speeds_kernel
+    :return: left and right motor speeds
+    """
+    cdef double vel_simplified = (l_motor_speed + r_motor_speed) / 2
+    cdef double move_pointing_ang, diff, half_diff
+    if vel_simplified == 0:
+        return l_motor_speed, r_motor_speed
+    move_pointing_ang = q if vel_simplified > 0 else q + M_PI
+    diff = _wrap_angle(angle_of_blockage - move_pointing_ang)
+    if (-diff if diff < 0 else diff) > restricted_angle:
+        return l_motor_speed, r_motor_speed
+    half_diff = (l_motor_speed - r_motor_speed) * 0.5
+    return half_diff, -half_diff
+
+
+def step_all(floating[::1] x, floating[::1] y, floating[::1] q, floating[::1] vel,
+             const floating[::1] l_motor_speed, const floating[::1] r_motor_speed, double k_vel, double k_lin, double k_ang):
+    """
+    Step all robots of a fleet in place, the arrays hold one value per robot
+    :return:
+    """
+    cdef Py_ssize_t i
+    cdef double speed_sum, k, qi
+    with nogil:
+        for i in range(x.shape[0]):
+            speed_sum = l_motor_speed[i] + r_motor_speed[i]
+            k = k_lin * speed_sum
+            qi = q[i]
+            vel[i] = k_vel * speed_sum
+            x[i] += k * cos(qi)
+            y[i] += k * sin(qi)
+            q[i] = _wrap_angle(qi + k_ang * (l_motor_speed[i] - r_motor_speed[i]))
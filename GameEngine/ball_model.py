@@ -1,11 +1,17 @@
-from abc import ABC, abstractmethod
 from enum import Enum
+from math import cos, inf, sin, sqrt
 from GameEngine.collisions import CollisionTypes
+from GameEngine.jit import NUMBA_AVAILABLE, njit, prange
 import logging
 import numpy as np
 
-class BallModel(ABC):
-    @abstractmethod
+class BallModel:
+    """
+    Ball model interface - plain base class, not ABC, to keep the instance creation and type checks cheap
+    """
+    __slots__ = ('_dt', '_heading_angle', '_x_vel', '_y_vel', 'vel_limit', '_x_pos', '_y_pos',
+                 'last_collision_object', 'steps_since_last_collision')
+
     def __init__(self, init_x_pos: float, init_y_pos: float, dt: float = 0.1):
         """
         :param dt: simulation time step
@@ -14,28 +20,26 @@ class BallModel(ABC):
         self._heading_angle = 0                             # robot heading direction, range <-pi, pi>
         self._x_vel = 0                                     # robot velocity
         self._y_vel = 0                                     # robot velocity
-        self.vel_limit = (-float('int'), float('int'))      # robot velocity limits
+        self.vel_limit = (-inf, inf)                        # robot velocity limits
         self._x_pos = init_x_pos                            # ball x coordinate in field coordinate system
         self._y_pos = init_y_pos                            # ball y coordinate in field coordinate system
 
         self.last_collision_object = None
         self.steps_since_last_collision = 1000
 
-    @abstractmethod
     def step(self, action):
         """
         Execute simulation step
         :return:
         """
-        pass
+        raise NotImplementedError
 
-    @abstractmethod
     def collision_step(self,  wall_collision:CollisionTypes, players_collision:CollisionTypes, collisions_with:list):
         """
         Define behavior in contact with other robot/ball/wall
         :return:
         """
-        pass
+        raise NotImplementedError
 
 
 class BallActions(Enum):
@@ -45,6 +49,9 @@ class BallActions(Enum):
 
 
 class BallBasicModel(BallModel):
+    __slots__ = ('_max_vel', '_friction', '_mass', '_vel_bounce_coefficient', 'radius', '_dt_sq', '_fom',
+                 'MINIMAL_TIME_BETWEEN_COLLISION_WITH_SAME_OBJECT')
+
     def __init__(self, init_x_pos: float, init_y_pos: float, dt: float = 0.1, friction:float = 0.01, mass:float = 0.1,
                  vel_bounce_coef: float = 0.8, radius:float = 0.01, ball_max_vel: float = 3):
         """
@@ -61,6 +68,8 @@ class BallBasicModel(BallModel):
         self._mass = mass                                   # ball mass
         self._vel_bounce_coefficient = vel_bounce_coef      # coefficient of velocity that is preserved after bounce
         self.radius = radius                                # ball dimensions
+        self._dt_sq = dt * dt                               # step invariants used in every simulation step
+        self._fom = friction / mass
 
         self.last_collision_object = None
         self.steps_since_last_collision = 1000
@@ -71,21 +80,22 @@ class BallBasicModel(BallModel):
         Execute simulation step
         :return:
         """
-        vel_sq = (self._x_vel**2 + self._y_vel**2)
-        vel = vel_sq**0.5
-        acc = -vel * self._friction / self._mass
+        vx, vy = self._x_vel, self._y_vel
+        vel_sq = vx * vx + vy * vy
+        if vel_sq < 1e-20:                                  # ball at rest
+            self.steps_since_last_collision += 1
+            return
+        dt, dt_sq = self._dt, self._dt_sq
+        vel = sqrt(vel_sq)
+        acc = -vel * self._fom
 
         acceleration_threshold = 0.01
-        if abs(acc) > acceleration_threshold:
-            acc_x = acc * self._x_vel / vel
-            acc_y = acc * self._y_vel / vel
-        else:
-            acc_x, acc_y = 0, 0
-        dt_sq = self._dt ** 2
-        self._x_pos += self._x_vel * self._dt + 0.5 * acc_x * dt_sq
-        self._y_pos += self._y_vel * self._dt + 0.5 * acc_y * dt_sq
-        self._x_vel += acc_x * self._dt
-        self._y_vel += acc_y * self._dt
+        acc_scale = acc / vel * (abs(acc) > acceleration_threshold)  # zero below the threshold
+        acc_x, acc_y = acc_scale * vx, acc_scale * vy
+        self._x_pos += vx * dt + 0.5 * acc_x * dt_sq
+        self._y_pos += vy * dt + 0.5 * acc_y * dt_sq
+        self._x_vel = vx + acc_x * dt
+        self._y_vel = vy + acc_y * dt
         # TODO: how about collision step?
         self.steps_since_last_collision += 1
 
@@ -151,106 +161,33 @@ class BallBasicModel(BallModel):
         :return:
         """
         player_pos_x, player_pos_y = collision_object.get_position_components_wcs()
-        player_radius = collision_object.radius
-        dx, dy = self._x_pos - player_pos_x, self._y_pos - player_pos_y
-        diff = (dx ** 2 + dy ** 2) ** 0.5  # TODO: add check if in collision range (of this time step)
         player_vx, player_vy = collision_object.get_velocity_components_wcs()
-
-        def similar_speeds(player_vx_, player_vy_):
-            speed_diff = np.hypot(player_vx_-self._x_vel, player_vy_-self._y_vel)
-            same_speed_threshold = 0.01
-            return speed_diff <= same_speed_threshold
-
-        if similar_speeds(player_vx, player_vy): return
-
-        """ Calculate intersection point between player and ball - assuming the ball radius ~= 0 for simplicity 
-         Using line equation: 
-         x = x0 + v_x * t 
-         y = y0 + v_y * t
-
-         Circle equation:
-         (x - x0)**2 + (y-y0)**2 = r**2 """
-
-        move_vel_threshold = 0.001              # TODO: find a better place for this
-        if abs(self._x_vel) >= move_vel_threshold:
-            # solving ax^2 + bx + c = 0
-            k = (self._y_vel / self._x_vel)
-            M = k * self._x_pos - self._y_pos + player_pos_y
-            a = (1 + k ** 2)
-            b = -2*(player_pos_x + M * k)
-            c = player_pos_x**2 + M**2 - player_radius**2
-        elif abs(self._y_vel) >= move_vel_threshold:
-            a = 1
-            b = -2 * player_pos_y
-            c = player_pos_y**2 + (self._x_pos - player_pos_x)**2 - player_radius**2
-        elif abs(player_vx) > move_vel_threshold:
-            k = (player_vy / player_vx)
-            M = k * player_pos_x - player_pos_y + self._y_pos  #k * self._x_pos - self._y_pos + player_pos_y
-            a = (1 + k ** 2)
-            b = -2 * (self._x_pos + M * k)
-            c = self._x_pos ** 2 + M ** 2 - player_radius ** 2
-        elif abs(player_vy) > move_vel_threshold:
-            raise NotImplementedError
-        else:
-            raise ValueError("No collision should happen if all vel are ~0")
-
-        #  solve quadratic equation
-        delta = b ** 2 - 4 * a * c
-        if delta < 0:
-            return
-        delta_root = delta ** 0.5
-        sol1, sol2 = (-b + delta_root) / (2 * a), (-b - delta_root) / (2 * a)
-        if abs(self._x_vel) >= move_vel_threshold or abs(player_vx) > move_vel_threshold:
-            x1, x2 = sol1, sol2
-            get_y = lambda _x_: self._y_pos + self._y_vel * (_x_ - self._x_pos) / self._x_vel
-            y1, y2 = get_y(x1), get_y(x2)
-        else:
-            x1, x2 = self._x_pos, self._x_pos
-            y1, y2 = sol1, sol2
-
-        dist_1 = (x1 - self._x_pos)**2 + (y1 - self._y_pos)**2
-        dist_2 = (x2 - self._x_pos)**2 + (y2 - self._y_pos)**2
-        collision_x, collision_y = (x1, y1) if dist_1 < dist_2 else (x2, y2)  #  get player-ball collision point
-
-        # https://math.stackexchange.com/questions/2239169/reflecting-a-vector-over-another-line
-        incoming_vector = (self._x_vel, self._y_vel)
-        m_x, m_y = incoming_vector
-        normal_reflection_vector = (collision_x - player_pos_x, collision_y - player_pos_y)
-        n_x, n_y = normal_reflection_vector
-
-        # scalar product of (incoming_vector * normal_reflection_vector) / (normal_reflection_vector * normal_reflection_vector)
-        sp = (m_x * n_x + m_y * n_y) / (n_x * n_x + n_y * n_y)
-        r_x = m_x - 2 * sp * n_x
-        r_y = m_y - 2 * sp * n_y
-
-        vel_ = (self._x_vel**2 + self._y_vel**2)**0.5
-        ref_vel = (r_x**2 + r_y**2)**0.5
-        # TODO: vel_ *= self._vel_bounce_coefficient
-        if abs(ref_vel) > move_vel_threshold:
-            vel_x = player_vx + r_x * vel_ / ref_vel
-            vel_y = player_vy + r_y * vel_ / ref_vel
-        else:
-            vel_x = player_vx
-            vel_y = player_vy
-        self._x_vel = vel_x
-        self._y_vel = vel_y
+        new_vel = _round_player_collision(self._x_pos, self._y_pos, self._x_vel, self._y_vel,
+                                          player_pos_x, player_pos_y, player_vx, player_vy, collision_object.radius)
+        if new_vel is not None:
+            self._x_vel, self._y_vel = new_vel
 
     def _kick_collision(self, collision_object, kick_vel: float = 0.4, **kwargs):
         """
         The ball is kick along line connecting player's and ball's centre points.
         :param collision_object:
         :param kick_vel: absolute velocity of kicked ball
-        :param kwargs:
+        :param kwargs: kick_angle - kick direction [rad] in field coordinate system, used instead of the line
         :return:
         """
         # TODO: check if in 'kick' range
         # TODO: take into consideration the ball incoming speed
+        kick_vel = min(kick_vel, self._max_vel)
+        kick_angle = kwargs.get('kick_angle')
+        if kick_angle is not None:
+            self._x_vel, self._y_vel = kick_vel * cos(kick_angle), kick_vel * sin(kick_angle)
+            return
         player_pos_x, player_pos_y = collision_object.get_position_components_wcs()
         dx, dy = self._x_pos - player_pos_x, self._y_pos - player_pos_y
-        diff = (dx**2 + dy**2)**0.5
-        kick_vel = min(kick_vel, self._max_vel)
-        self._x_vel = kick_vel * dx / diff
-        self._y_vel = kick_vel * dy / diff
+        diff_sq = dx * dx + dy * dy
+        vel_scale = kick_vel / sqrt(diff_sq) if diff_sq > 0 else 0.0
+        self._x_vel = vel_scale * dx
+        self._y_vel = vel_scale * dy
 
     def _receive_collision(self, collision_object):
         """
@@ -265,6 +202,317 @@ class BallBasicModel(BallModel):
         return self._x_pos, self._y_pos
 
 
+def _reflect_velocity(m_x, m_y, n_x, n_y):
+    """
+    Reflect the incoming vector m over the normal vector n, works for floats as well as for np.ndarray
+    https://math.stackexchange.com/questions/2239169/reflecting-a-vector-over-another-line
+    :return: reflected vector x, y components
+    """
+    # scalar product of (incoming_vector * normal_reflection_vector) / (normal_reflection_vector * normal_reflection_vector)
+    sp = (m_x * n_x + m_y * n_y) / (n_x * n_x + n_y * n_y)
+    return m_x - 2 * sp * n_x, m_y - 2 * sp * n_y
+
+
+def _round_player_collision(x0, y0, vx, vy, player_pos_x, player_pos_y, player_vx, player_vy, player_radius):
+    """
+    Ball bounce from the round player, the ball diameter is assumed 0, the ball rotation effect is mitigated
+    :param x0: ball x coordinate, same for y0 and the ball velocity vx, vy
+    :param player_pos_x: player x coordinate, same for the player y coordinate and velocity
+    :param player_radius:
+    :return: ball velocity (x, y) after the bounce, None if the ball does not bounce
+    """
+    dx, dy = x0 - player_pos_x, y0 - player_pos_y
+    diff_sq = dx * dx + dy * dy  # TODO: add check if in collision range (of this time step)
+    rel_vx, rel_vy = vx - player_vx, vy - player_vy
+    rel_vel_sq = rel_vx * rel_vx + rel_vy * rel_vy
+
+    same_speed_threshold = 0.01
+    if rel_vel_sq <= same_speed_threshold * same_speed_threshold:
+        return None
+
+    """ Calculate the point where the ball enters the player - assuming the ball radius ~= 0 for simplicity
+     The ball movement relative to the player (x0 + v_x * t, y0 + v_y * t) is closest to the player centre at
+     t* = -(d . v) / (v . v), with squared distance h**2 = |d|**2 + (d . v) * t*.
+     The ball misses the player if h > r, otherwise it enters the player circle at t = t* - sqrt((r**2 - h**2) / (v . v)) """
+
+    move_vel_threshold = 0.001              # TODO: find a better place for this
+    inv_rel_vel_sq = 1.0 / rel_vel_sq       # similar speeds are already excluded
+    d_dot_v = rel_vx * dx + rel_vy * dy
+    t_closest = -d_dot_v * inv_rel_vel_sq
+    closest_sq = diff_sq + d_dot_v * t_closest
+    radius_sq = player_radius * player_radius
+    if closest_sq > radius_sq:
+        return None
+    t = t_closest - sqrt((radius_sq - closest_sq) * inv_rel_vel_sq)
+    # player-ball collision point (x0 + rel_vx * t, y0 + rel_vy * t) relative to the player centre
+    n_x, n_y = dx + rel_vx * t, dy + rel_vy * t
+
+    # reflect the incoming vector (ball velocity) over the normal at the collision point
+    r_x, r_y = _reflect_velocity(vx, vy, n_x, n_y)
+
+    vel_ = sqrt(vx * vx + vy * vy)
+    ref_vel = sqrt(r_x * r_x + r_y * r_y)
+    # TODO: vel_ *= vel_bounce_coefficient
+    if abs(ref_vel) > move_vel_threshold:
+        vel_scale = vel_ / ref_vel
+        return player_vx + r_x * vel_scale, player_vy + r_y * vel_scale
+    return player_vx, player_vy
+
+
+def _round_player_collisions(x0, y0, vx, vy, player_pos_x, player_pos_y, player_vx, player_vy, player_radius):
+    """
+    Vectorized _round_player_collision for arrays of ball-player pairs (contiguous float64 arrays of the same length)
+    :return: ball velocity x, y arrays after the bounce and boolean array - True where the ball does bounce
+    """
+    same_speed_threshold, move_vel_threshold = 0.01, 0.001
+    dx, dy = x0 - player_pos_x, y0 - player_pos_y
+    rel_vx, rel_vy = vx - player_vx, vy - player_vy
+    rel_vel_sq = rel_vx * rel_vx + rel_vy * rel_vy
+    moving = rel_vel_sq > same_speed_threshold * same_speed_threshold
+
+    # same closed form as the scalar version, the pairs not bouncing get safe values
+    inv_rel_vel_sq = 1.0 / np.where(moving, rel_vel_sq, 1.0)
+    d_dot_v = rel_vx * dx + rel_vy * dy
+    t_closest = -d_dot_v * inv_rel_vel_sq
+    closest_sq = dx * dx + dy * dy + d_dot_v * t_closest
+    radius_sq = player_radius * player_radius
+    bounce = moving & (closest_sq <= radius_sq)
+    t = t_closest - np.sqrt(np.where(bounce, radius_sq - closest_sq, 0.0) * inv_rel_vel_sq)
+
+    n_x, n_y = dx + rel_vx * t, dy + rel_vy * t
+    n_x[~bounce] = 1.0
+    r_x, r_y = _reflect_velocity(vx, vy, n_x, n_y)
+
+    vel_ = np.sqrt(vx * vx + vy * vy)
+    ref_vel = np.sqrt(r_x * r_x + r_y * r_y)
+    scale = np.where(ref_vel > move_vel_threshold, vel_ / np.where(ref_vel > 0, ref_vel, 1.0), 0.0)
+    return player_vx + r_x * scale, player_vy + r_y * scale, bounce
+
+
+try:
+    # compiled version of the model, see setup.py - python implementation above is used when it is not built
+    from GameEngine.ball_model_c import CBall as BallBasicModel
+except ImportError:
+    pass
+
+
+@njit(cache=True, fastmath=True)
+def _simulate(x, y, vx, vy, dt, friction, mass, steps, out_x, out_y, out_vx, out_vy):
+    """
+    Simulate the free movement of a single ball for a number of steps, same model as BallBasicModel.step
+    :param out_x: preallocated array for the x coordinate history (len >= steps), same for out_y, out_vx, out_vy
+    :return: final state x, y, vx, vy
+    """
+    acceleration_threshold = 0.01
+    dt_sq = dt * dt
+    for i in range(steps):
+        vel_sq = vx * vx + vy * vy
+        if vel_sq < 1e-20:  # ball at rest
+            out_x[i], out_y[i], out_vx[i], out_vy[i] = x, y, vx, vy
+            continue
+        vel = sqrt(vel_sq)
+        acc = -vel * friction / mass
+        acc_scale = acc / vel * (abs(acc) > acceleration_threshold)
+        acc_x, acc_y = acc_scale * vx, acc_scale * vy
+        x += vx * dt + 0.5 * acc_x * dt_sq
+        y += vy * dt + 0.5 * acc_y * dt_sq
+        vx += acc_x * dt
+        vy += acc_y * dt
+        out_x[i], out_y[i], out_vx[i], out_vy[i] = x, y, vx, vy
+    return x, y, vx, vy
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _fused_step(x, y, vx, vy, dt, fom):
+    """
+    Simulation step of all balls in the pool (in place), same model as BallBasicModel.step
+    Each ball state is read and written once - the whole update is done in registers
+    :param fom: friction / mass
+    :return:
+    """
+    acceleration_threshold = 0.01
+    half_dt_sq = 0.5 * dt * dt
+    for i in prange(x.shape[0]):
+        vx_i, vy_i = vx[i], vy[i]
+        vel_sq = vx_i * vx_i + vy_i * vy_i
+        if vel_sq < 1e-20:  # ball at rest - nothing to write
+            continue
+        vel = sqrt(vel_sq)
+        acc = -vel * fom
+        acc_scale = acc / vel * (abs(acc) > acceleration_threshold)
+        acc_x, acc_y = acc_scale * vx_i, acc_scale * vy_i
+        x[i] += vx_i * dt + acc_x * half_dt_sq
+        y[i] += vy_i * dt + acc_y * half_dt_sq
+        vx[i] = vx_i + acc_x * dt
+        vy[i] = vy_i + acc_y * dt
+
+
+class BallPool:
+    def __init__(self, init_x_pos, init_y_pos, dt: float = 0.1, friction: float = 0.01, mass: float = 0.1,
+                 vel_bounce_coef: float = 0.8, radius: float = 0.01, ball_max_vel: float = 3,
+                 field_bounds: tuple = None):
+        """
+        Many balls sharing the same physical parameters, the state is kept as structure of arrays (one array per
+        state component) so the whole pool is stepped with a few vectorized operations
+        :param init_x_pos: balls x coordinates in field coordinate system
+        :param init_y_pos: balls y coordinates in field coordinate system
+        :param dt: simulation time step
+        :param field_bounds: walls (x_min, x_max, y_min, y_max), the balls bounce from them every step, None - no walls
+        """
+        self.x = np.array(init_x_pos, dtype=np.float64).ravel()    # balls x coordinates in field coordinate system
+        self.y = np.array(init_y_pos, dtype=np.float64).ravel()    # balls y coordinates in field coordinate system
+        if self.x.shape != self.y.shape:
+            raise ValueError("The x and y coordinates of the balls do not match")
+        self.vx = np.zeros_like(self.x)                             # balls velocity x component
+        self.vy = np.zeros_like(self.x)                             # balls velocity y component
+        self._dt = dt
+        self._max_vel = ball_max_vel                                # ball velocity limits
+        self._friction = friction                                   # friction proportional to vel
+        self._mass = mass                                           # ball mass
+        self._vel_bounce_coefficient = vel_bounce_coef              # coefficient of velocity that is preserved after bounce
+        self.radius = radius                                        # ball dimensions
+        self._fom = friction / mass
+        self.field_bounds = field_bounds
+
+    @classmethod
+    def from_balls(cls, balls: list, field_bounds: tuple = None):
+        """
+        Build the pool from already existing balls, the parameters of the first ball are used for the whole pool
+        :param balls: list of BallBasicModel
+        :param field_bounds: walls (x_min, x_max, y_min, y_max)
+        :return:
+        """
+        ball = balls[0]
+        pool = cls([b._x_pos for b in balls], [b._y_pos for b in balls], dt=ball._dt, friction=ball._friction,
+                   mass=ball._mass, vel_bounce_coef=ball._vel_bounce_coefficient, radius=ball.radius,
+                   ball_max_vel=ball._max_vel, field_bounds=field_bounds)
+        pool.vx[:] = [b._x_vel for b in balls]
+        pool.vy[:] = [b._y_vel for b in balls]
+        return pool
+
+    def __len__(self):
+        return self.x.shape[0]
+
+    def step_all(self):
+        """
+        Execute simulation step for all balls, same model as BallBasicModel.step
+        :return:
+        """
+        if NUMBA_AVAILABLE:
+            _fused_step(self.x, self.y, self.vx, self.vy, self._dt, self._fom)
+        else:
+            self._vectorized_step()
+        if self.field_bounds is not None:
+            self.apply_walls(*self.field_bounds)
+
+    def _vectorized_step(self):
+        """
+        NumPy version of _fused_step - used when numba is not available
+        :return:
+        """
+        dt = self._dt
+        vx, vy = self.vx, self.vy
+        vel = np.sqrt(vx * vx + vy * vy)
+        acc = -vel * self._fom
+
+        acceleration_threshold = 0.01
+        # acc / vel with zero for the balls below threshold (also the ones at rest, vel == 0)
+        acc_scale = acc / np.where(vel > 0, vel, 1)
+        acc_scale *= np.abs(acc) > acceleration_threshold
+        acc_x = acc_scale * vx
+        acc_y = acc_scale * vy
+
+        half_dt_sq = 0.5 * dt * dt
+        np.add(self.x, vx * dt + acc_x * half_dt_sq, out=self.x)
+        np.add(self.y, vy * dt + acc_y * half_dt_sq, out=self.y)
+        np.multiply(acc_x, dt, out=acc_x)
+        np.multiply(acc_y, dt, out=acc_y)
+        np.add(vx, acc_x, out=vx)
+        np.add(vy, acc_y, out=vy)
+
+    def apply_walls(self, x_min: float, x_max: float, y_min: float, y_max: float):
+        """
+        Bounce the balls that crossed the walls (and are still moving outwards), the balls are moved back to the wall
+        :return:
+        """
+        coef = -self._vel_bounce_coefficient
+        hit_vertical = ((self.x >= x_max) & (self.vx > 0)) | ((self.x <= x_min) & (self.vx < 0))
+        self.vx[hit_vertical] *= coef
+        hit_horizontal = ((self.y >= y_max) & (self.vy > 0)) | ((self.y <= y_min) & (self.vy < 0))
+        self.vy[hit_horizontal] *= coef
+        np.clip(self.x, x_min, x_max, out=self.x)
+        np.clip(self.y, y_min, y_max, out=self.y)
+
+    def players_in_range(self, players: 'PlayerPool', range_factor: float = 4.0):
+        """
+        Check all balls against all players at once
+        :param players:
+        :param range_factor: squared distance threshold relative to the squared player radius
+        :return: boolean array (balls x players), True where the ball is in collision range of the player
+        """
+        dx = self.x[:, None] - players.px[None, :]
+        dy = self.y[:, None] - players.py[None, :]
+        return dx * dx + dy * dy <= (range_factor * players.pr2)[None, :]
+
+    def collide_with_players(self, players: 'PlayerPool'):
+        """
+        Bounce the balls from the players they are in range of, both the range check and the collision calculation
+        of the colliding pairs are vectorized
+        :param players:
+        :return: array of colliding (ball index, player index) pairs
+        """
+        pairs = np.argwhere(self.players_in_range(players))
+        if len(pairs) == 0:
+            return pairs
+        # TODO: handles just one player per ball for now (the first one)
+        _, first = np.unique(pairs[:, 0], return_index=True)
+        balls, targets = pairs[first, 0], pairs[first, 1]
+        vel_x, vel_y, bounce = _round_player_collisions(
+            self.x[balls], self.y[balls], self.vx[balls], self.vy[balls], players.px[targets], players.py[targets],
+            players.pvx[targets], players.pvy[targets], players.pr[targets])
+        self.vx[balls[bounce]] = vel_x[bounce]
+        self.vy[balls[bounce]] = vel_y[bounce]
+        return pairs
+
+    def get_position(self, index: int):
+        return float(self.x[index]), float(self.y[index])
+
+    def get_positions(self):
+        return np.array([self.x, self.y])
+
+
+class PlayerPool:
+    def __init__(self, players: list):
+        """
+        Players state cached as arrays for the vectorized collision checks with BallPool
+        :param players: objects providing get_position_components_wcs, get_velocity_components_wcs and radius
+        """
+        self.players = list(players)
+        number_of_players = len(self.players)
+        self.px = np.empty(number_of_players)                       # players x coordinates
+        self.py = np.empty(number_of_players)                       # players y coordinates
+        self.pvx = np.empty(number_of_players)                      # players velocity x component
+        self.pvy = np.empty(number_of_players)                      # players velocity y component
+        self.pr = np.array([player.radius for player in self.players], dtype=np.float64)
+        self.pr2 = self.pr * self.pr
+        self.update()
+
+    def update(self):
+        """
+        Refresh the cached state from the players - once per simulation step
+        :return:
+        """
+        for i, player in enumerate(self.players):
+            self.px[i], self.py[i] = player.get_position_components_wcs()
+            self.pvx[i], self.pvy[i] = player.get_velocity_components_wcs()
+
+    def positions(self):
+        return self.px, self.py
+
+    def velocities(self):
+        return self.pvx, self.pvy
+
+
 # TODO: move to separate test file and integrate it with pytest or other testing framework
 class BallTests:
 
@@ -274,14 +522,11 @@ class BallTests:
         x0, y0 = 0, 0
         steps = 1000
         ball = BallBasicModel(init_x_pos=x0, init_y_pos=y0)
-        history = {'x': [], 'y': [], 'dx': [], 'dy': [], 't': []}
+        history = {'x': np.empty(steps), 'y': np.empty(steps), 't': np.arange(steps)}
 
         for i in range(steps):
             ball.step()
-            x, y = ball.get_position()
-            history['x'].append(x)
-            history['y'].append(y)
-            history['t'].append(i)
+            history['x'][i], history['y'][i] = ball.get_position()
         plt.plot(history['t'], history['x'], label='x_pos')
         plt.plot(history['t'], history['y'], label='y_pos')
         return True
@@ -293,13 +538,12 @@ class BallTests:
         steps = 1000
         ball = BallBasicModel(init_x_pos=x0, init_y_pos=y0)
         ball._x_vel, ball._y_vel = vx0, vy0
-        history = {'x': [], 'y': [], 'dx': [], 'dy': [], 't': []}
+        history = {'x': np.empty(steps), 'y': np.empty(steps), 'dx': np.empty(steps), 'dy': np.empty(steps),
+                   't': np.arange(steps)}
 
-        for i in range(steps):
-            ball.step()
-            x, y = ball.get_position()
-            history['x'].append(x), history['y'].append(y), history['t'].append(i)
-            history['dx'].append(ball._x_vel), history['dy'].append(ball._y_vel)
+        ball._x_pos, ball._y_pos, ball._x_vel, ball._y_vel = _simulate(
+            float(ball._x_pos), float(ball._y_pos), float(ball._x_vel), float(ball._y_vel), ball._dt, ball._friction,
+            ball._mass, steps, history['x'], history['y'], history['dx'], history['dy'])
         f, (ax1, ax2, ax3) = plt.subplots(3, 1)
         ax1.plot(history['x'], history['y'], label='pos')
         ax1.legend()
@@ -319,14 +563,14 @@ class BallTests:
         steps, wall_step = 1000, 300
         ball = BallBasicModel(init_x_pos=x0, init_y_pos=y0)
         ball._x_vel, ball._y_vel = vx0, vy0
-        history = {'x': [], 'y': [], 'dx': [], 'dy': [], 't': []}
+        history = {'x': np.empty(steps), 'y': np.empty(steps), 'dx': np.empty(steps), 'dy': np.empty(steps),
+                   't': np.arange(steps)}
 
         for i in range(steps):
             ball.step()
             if i == wall_step: ball._wall_collision(wall_type)
-            x, y = ball.get_position()
-            history['x'].append(x), history['y'].append(y), history['t'].append(i)
-            history['dx'].append(ball._x_vel), history['dy'].append(ball._y_vel)
+            history['x'][i], history['y'][i] = ball.get_position()
+            history['dx'][i], history['dy'][i] = ball._x_vel, ball._y_vel
 
         f, (ax1, ax2, ax3) = plt.subplots(3, 1)
         ax1.plot(history['x'], history['y'], label='pos')
@@ -354,14 +598,14 @@ class BallTests:
         player = DummpPlayer(player_pos_x, player_pos_y)
         steps, kick_step, kick_speed = 1000, 200, 5
         ball = BallBasicModel(init_x_pos=x0, init_y_pos=y0)
-        history = {'x': [], 'y': [], 'dx': [], 'dy': [], 't': []}
+        history = {'x': np.empty(steps), 'y': np.empty(steps), 'dx': np.empty(steps), 'dy': np.empty(steps),
+                   't': np.arange(steps)}
 
         for i in range(steps):
             ball.step()
             if i == kick_step: ball._kick_collision(player, kick_speed)
-            x, y = ball.get_position()
-            history['x'].append(x), history['y'].append(y), history['t'].append(i)
-            history['dx'].append(ball._x_vel), history['dy'].append(ball._y_vel)
+            history['x'][i], history['y'][i] = ball.get_position()
+            history['dx'][i], history['dy'][i] = ball._x_vel, ball._y_vel
 
         f, (ax1, ax2, ax3) = plt.subplots(3, 1)
         ax1.plot(history['x'], history['y'], label='pos')
@@ -374,6 +618,13 @@ class BallTests:
         ax3.legend()
         return True
 
+    @staticmethod
+    def test_kick_angle():
+        ball = BallBasicModel(init_x_pos=0, init_y_pos=0)
+        ball._kick_collision(None, 2, kick_angle=np.pi / 3)
+        assert np.allclose((ball._x_vel, ball._y_vel), (2 * np.cos(np.pi / 3), 2 * np.sin(np.pi / 3)))
+        return True
+
     @staticmethod
     def test_receive(player_vel_x=0, player_vel_y=0):
         import matplotlib.pyplot as plt
@@ -389,14 +640,14 @@ class BallTests:
         steps, kick_step = 1000, 200
         ball = BallBasicModel(init_x_pos=x0, init_y_pos=y0)
         ball._x_vel, ball._y_vel = vx0, vy0
-        history = {'x': [], 'y': [], 'dx': [], 'dy': [], 't': []}
+        history = {'x': np.empty(steps), 'y': np.empty(steps), 'dx': np.empty(steps), 'dy': np.empty(steps),
+                   't': np.arange(steps)}
 
         for i in range(steps):
             ball.step()
             if i == kick_step: ball._receive_collision(player)
-            x, y = ball.get_position()
-            history['x'].append(x), history['y'].append(y), history['t'].append(i)
-            history['dx'].append(ball._x_vel), history['dy'].append(ball._y_vel)
+            history['x'][i], history['y'][i] = ball.get_position()
+            history['dx'][i], history['dy'][i] = ball._x_vel, ball._y_vel
 
         f, (ax1, ax2, ax3) = plt.subplots(3, 1)
         ax1.plot(history['x'], history['y'], label='pos')
@@ -438,16 +689,16 @@ class BallTests:
         steps, event_index = int(time/dt), int(0.5*time/dt)
         ball = BallBasicModel(init_x_pos=ball_pos_x, init_y_pos=ball_pos_y, dt=dt)
         ball._x_vel, ball._y_vel = ball_vel_x, ball_vel_y
-        history = {'x': [], 'y': [], 'dx': [], 'dy': [], 't': []}
+        history = {'x': np.empty(steps), 'y': np.empty(steps), 'dx': np.empty(steps), 'dy': np.empty(steps),
+                   't': np.arange(steps) * dt}
         collide = False
         for i in range(steps):
             ball.step()
             if player.in_range(*ball.get_position()) and not collide:
                 ball._elastic_collision_with_round_player(player)
                 collide = True
-            x, y = ball.get_position()
-            history['x'].append(x), history['y'].append(y), history['t'].append(i*dt)
-            history['dx'].append(ball._x_vel), history['dy'].append(ball._y_vel)
+            history['x'][i], history['y'][i] = ball.get_position()
+            history['dx'][i], history['dy'][i] = ball._x_vel, ball._y_vel
 
         f, (ax1, ax2, ax3) = plt.subplots(3, 1)
         f.suptitle(f"test_collision_with_round_player: initial conditions: \nplayer (x, y, x', y', size): {player_pos_x, player_pos_y,player_vel_x, player_vel_y, player_radius} \nball (x, y, x', y'): {ball_pos_x, ball_pos_y,ball_vel_x, ball_vel_y}, \ndt={dt}, time={time} ")
@@ -465,6 +716,77 @@ class BallTests:
         ax3.legend()
         return True
 
+    @staticmethod
+    def test_ball_pool_matches_single_ball(steps=1000):
+        init_states = [(0, 0, 1, -2), (1, 2, 0, 0), (-3, 1, 0.05, 0.02), (2, -1, -4, 3)]
+        balls = []
+        for x0, y0, vx0, vy0 in init_states:
+            ball = BallBasicModel(init_x_pos=x0, init_y_pos=y0)
+            ball._x_vel, ball._y_vel = vx0, vy0
+            balls.append(ball)
+        pool = BallPool.from_balls(balls)
+
+        for i in range(steps):
+            pool.step_all()
+            for ball in balls:
+                ball.step()
+        for i, ball in enumerate(balls):
+            assert np.allclose(pool.get_position(i), ball.get_position())
+            assert np.allclose((pool.vx[i], pool.vy[i]), (ball._x_vel, ball._y_vel))
+        return True
+
+    @staticmethod
+    def test_ball_pool_collision_with_round_players(dt=0.01, time=5):
+
+        class DummpPlayer:
+            def __init__(self, x, y, vx, vy, r):
+                self.x, self.y = x, y
+                self.vx, self.vy = vx, vy
+                self.radius = r
+
+            def get_velocity_components_wcs(self):
+                return self.vx, self.vy
+
+            def get_position_components_wcs(self):
+                return self.x, self.y
+
+        players = [DummpPlayer(0, 10, 0, 0, 0.1), DummpPlayer(10, 0, 0, 0, 0.1), DummpPlayer(6, 10, 0, 0, 0.1)]
+        init_states = [(0, 0, 0, 5), (0, 0, 5, 0), (0, 0, 3, 5)]
+        balls = []
+        for x0, y0, vx0, vy0 in init_states:
+            ball = BallBasicModel(init_x_pos=x0, init_y_pos=y0, dt=dt)
+            ball._x_vel, ball._y_vel = vx0, vy0
+            balls.append(ball)
+        pool, player_pool = BallPool.from_balls(balls), PlayerPool(players)
+
+        collided = set()
+        for i in range(int(time / dt)):
+            pool.step_all()
+            for ball_id, player_id in pool.collide_with_players(player_pool):
+                collided.add((ball_id, player_id))
+            for ball_id, ball in enumerate(balls):
+                ball.step()
+                for player_id, player in enumerate(players):
+                    x, y = ball.get_position()
+                    if (x - player.x) ** 2 + (y - player.y) ** 2 <= 4 * player.radius ** 2:
+                        ball._elastic_collision_with_round_player(player)
+        assert collided == {(0, 0), (1, 1), (2, 2)}
+        for i, ball in enumerate(balls):
+            assert np.allclose(pool.get_position(i), ball.get_position())
+            assert np.allclose((pool.vx[i], pool.vy[i]), (ball._x_vel, ball._y_vel))
+        return True
+
+    @staticmethod
+    def test_ball_pool_wall_bouncing(steps=1000):
+        field_bounds = (-5, 5, -3, 3)
+        pool = BallPool([0, 1, -2, 4], [0, -1, 2, 0], field_bounds=field_bounds)
+        pool.vx[:], pool.vy[:] = [1, -3, 0.5, 2], [2, 1, -4, 0]
+        for i in range(steps):
+            pool.step_all()
+            assert np.all((field_bounds[0] <= pool.x) & (pool.x <= field_bounds[1]))
+            assert np.all((field_bounds[2] <= pool.y) & (pool.y <= field_bounds[3]))
+        return True
+
 
 if __name__ == "__main__":
     #BallTests.test_ball_stationary()
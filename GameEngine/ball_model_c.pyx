@@ -0,0 +1,206 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Compiled version of BallBasicModel, build with `python setup.py build_ext --inplace`
+When built, GameEngine.ball_model uses CBall as BallBasicModel - keep both implementations in sync
+"""
+cimport cython
+from libc.math cimport sqrt, fabs, rint, sin, cos
+import logging
+from GameEngine.collisions import CollisionTypes
+from GameEngine.ball_model import BallActions
+
+
+@cython.cdivision(True)
+cdef inline bint _round_player_collision(double x0, double y0, double vx, double vy,
+                                         double player_pos_x, double player_pos_y,
+                                         double player_vx, double player_vy, double player_radius,
+                                         double* out_vx, double* out_vy) noexcept nogil:
+    """
+    Ball bounce from the round player, same as GameEngine.ball_model._round_player_collision
+    :return: False if the ball does not bounce, otherwise the new velocity is written to out_vx, out_vy
+    """
+    cdef double dx = x0 - player_pos_x, dy = y0 - player_pos_y
+    cdef double rel_vx = vx - player_vx, rel_vy = vy - player_vy
+    cdef double rel_vel_sq = rel_vx * rel_vx + rel_vy * rel_vy
+    cdef double same_speed_threshold = 0.01, move_vel_threshold = 0.001
+    cdef double inv_rel_vel_sq, d_dot_v, t_closest, closest_sq, radius_sq, t, n_x, n_y, sp, r_x, r_y, vel_, ref_vel
+
+    if rel_vel_sq <= same_speed_threshold * same_speed_threshold:
+        return False
+
+    # ball movement relative to the player (x0 + v_x * t, y0 + v_y * t) closest to the player centre at t_closest,
+    # it enters the player circle sqrt((r**2 - closest**2) / (v . v)) before that
+    inv_rel_vel_sq = 1.0 / rel_vel_sq
+    d_dot_v = rel_vx * dx + rel_vy * dy
+    t_closest = -d_dot_v * inv_rel_vel_sq
+    closest_sq = dx * dx + dy * dy + d_dot_v * t_closest
+    radius_sq = player_radius * player_radius
+    if closest_sq > radius_sq:
+        return False
+    t = t_closest - sqrt((radius_sq - closest_sq) * inv_rel_vel_sq)
+
+    n_x = dx + rel_vx * t
+    n_y = dy + rel_vy * t
+    sp = (vx * n_x + vy * n_y) / (n_x * n_x + n_y * n_y)
+    r_x = vx - 2 * sp * n_x
+    r_y = vy - 2 * sp * n_y
+
+    vel_ = sqrt(vx * vx + vy * vy)
+    ref_vel = sqrt(r_x * r_x + r_y * r_y)
+    if fabs(ref_vel) > move_vel_threshold:
+        vel_ /= ref_vel
+        out_vx[0] = player_vx + r_x * vel_
+        out_vy[0] = player_vy + r_y * vel_
+    else:
+        out_vx[0] = player_vx
+        out_vy[0] = player_vy
+    return True
+
+
+cdef class CBall:
+    cdef public double _dt, _heading_angle, _x_vel, _y_vel, _max_vel, _x_pos, _y_pos
+    cdef public double _friction, _mass, _vel_bounce_coefficient, radius, _dt_sq, _fom
+    cdef public object last_collision_object
+    cdef public long steps_since_last_collision
+    cdef public long MINIMAL_TIME_BETWEEN_COLLISION_WITH_SAME_OBJECT
+
+    def __init__(self, double init_x_pos, double init_y_pos, double dt=0.1, double friction=0.01, double mass=0.1,
+                 double vel_bounce_coef=0.8, double radius=0.01, double ball_max_vel=3):
+        """
+        :param dt: simulation time step
+        """
+        self._dt = dt
+        self._heading_angle = 0
+        self._x_vel = 0
+        self._y_vel = 0
+        self._max_vel = ball_max_vel
+        self._x_pos = init_x_pos
+        self._y_pos = init_y_pos
+        self._friction = friction
+        self._mass = mass
+        self._vel_bounce_coefficient = vel_bounce_coef
+        self.radius = radius
+        self._dt_sq = dt * dt
+        self._fom = friction / mass
+
+        self.last_collision_object = None
+        self.steps_since_last_collision = 1000
+        self.MINIMAL_TIME_BETWEEN_COLLISION_WITH_SAME_OBJECT = 0
+
+    @cython.cdivision(True)
+    cpdef void step(self) noexcept:
+        """
+        Execute simulation step
+        :return:
+        """
+        cdef double dt = self._dt, dt_sq = self._dt_sq
+        cdef double vx = self._x_vel, vy = self._y_vel
+        cdef double vel_sq = vx * vx + vy * vy
+        cdef double vel, acc, acc_scale, acc_x, acc_y
+
+        self.steps_since_last_collision += 1
+        if vel_sq < 1e-20:  # ball at rest
+            return
+        vel = sqrt(vel_sq)
+        acc = -vel * self._fom
+        acc_scale = acc / vel * (fabs(acc) > 0.01)
+        acc_x, acc_y = acc_scale * vx, acc_scale * vy
+
+        self._x_pos += vx * dt + 0.5 * acc_x * dt_sq
+        self._y_pos += vy * dt + 0.5 * acc_y * dt_sq
+        self._x_vel = vx + acc_x * dt
+        self._y_vel = vy + acc_y * dt
+
+    def players_actions(self, actions):
+        if len(actions) > 1:
+            logging.warning("Thy multiple actions are not supported yet - executing first action")
+        object = actions[0][0]
+        action_type = actions[0][1]
+        if action_type == BallActions.KICK:
+            self._kick_collision(object)
+        elif action_type == BallActions.RECEIVE:
+            self._receive_collision(object)
+
+    def collision_step(self, wall_collision, players_collision, collisions_with):
+        """
+        Define behavior in contact with other robot/ball/wall
+        :return:
+        """
+        if (wall_collision != CollisionTypes.NO and players_collision != CollisionTypes.NO) or len(collisions_with) > 1:
+            logging.warning("Thy multiple collision are not supported yet")
+            if wall_collision != CollisionTypes.NO:
+                logging.warning("Handling just wall collision")
+                players_collision = CollisionTypes.NO
+            else:
+                logging.warning("Handling just first player collision")
+                collisions_with = [collisions_with[0]]
+            self._wall_collision(wall_collision)
+
+        if wall_collision != CollisionTypes.NO:
+            self._wall_collision(wall_collision)
+        if players_collision != CollisionTypes.NO:
+            if self.steps_since_last_collision <= self.MINIMAL_TIME_BETWEEN_COLLISION_WITH_SAME_OBJECT and \
+                    collisions_with == self.last_collision_object:
+                pass
+            else:
+                collisions_with = collisions_with[0]
+                self._elastic_collision_with_round_player(collisions_with)
+                self.steps_since_last_collision = 0
+                self.last_collision_object = collisions_with
+
+    def _wall_collision(self, collision_type):
+        """
+        Ball bounce from the static wall - can be horizontal or vertical
+        :return:
+        """
+        if collision_type == CollisionTypes.WALL_VERTICAL or collision_type == CollisionTypes.WALL_CORNER:
+            self._x_vel *= -1 * self._vel_bounce_coefficient
+            self._x_pos = rint(self._x_pos)
+        if collision_type == CollisionTypes.WALL_HORIZONTAL or collision_type == CollisionTypes.WALL_CORNER:
+            self._y_vel *= -1 * self._vel_bounce_coefficient
+            self._y_pos = rint(self._y_pos)
+
+    def _elastic_collision_with_round_player(self, collision_object):
+        """
+        Ball bounce from the round player, the ball diameter is assumed 0, the ball rotation effect is mitigated
+        :param collision_object:
+        :return:
+        """
+        cdef double player_pos_x, player_pos_y, player_vx, player_vy, vx, vy
+        player_pos_x, player_pos_y = collision_object.get_position_components_wcs()
+        player_vx, player_vy = collision_object.get_velocity_components_wcs()
+        if _round_player_collision(self._x_pos, self._y_pos, self._x_vel, self._y_vel, player_pos_x, player_pos_y,
+                                   player_vx, player_vy, collision_object.radius, &vx, &vy):
+            self._x_vel, self._y_vel = vx, vy
+
+    def _kick_collision(self, collision_object, double kick_vel=0.4, **kwargs):
+        """
+        The ball is kick along line connecting player's and ball's centre points.
+        :param collision_object:
+        :param kick_vel: absolute velocity of kicked ball
+        :param kwargs: kick_angle - kick direction [rad] in field coordinate system, used instead of the line
+        :return:
+        """
+        cdef double player_pos_x, player_pos_y, dx, dy, diff_sq, vel_scale, kick_angle
+        kick_vel = min(kick_vel, self._max_vel)
+        if kwargs.get('kick_angle') is not None:
+            kick_angle = kwargs['kick_angle']
+            self._x_vel, self._y_vel = kick_vel * cos(kick_angle), kick_vel * sin(kick_angle)
+            return
+        player_pos_x, player_pos_y = collision_object.get_position_components_wcs()
+        dx, dy = self._x_pos - player_pos_x, self._y_pos - player_pos_y
+        diff_sq = dx * dx + dy * dy
+        vel_scale = kick_vel / sqrt(diff_sq) if diff_sq > 0 else 0.0
+        self._x_vel = vel_scale * dx
+        self._y_vel = vel_scale * dy
+
+    def _receive_collision(self, collision_object):
+        """
+        Match the ball velocity to player's velocity
+        :param collision_object:
+        :return:
+        """
+        self._x_vel, self._y_vel = collision_object.get_velocity_components_wcs()
+
+    def get_position(self):
+        return self._x_pos, self._y_pos
@@ -28,7 +28,11 @@ class GameSimulator:
         for team in range(self._number_of_teams):
             for player_id in range(self._number_of_robots):
                 self._robots[team].append(
-                    self._robot_class(*self.team_starting_points[player_id], cord_system_rot=self.team_CS_rotations[team]))
+                    self._robot_class(*self.team_starting_points[player_id], cord_system_rot=self.team_CS_rotations[team],
+                                      size_of_field=self._size_of_field))
+        self._all_robots = [robot for team_robots in self._robots for robot in team_robots]  # team by team
+        self._positions = np.empty((len(self._all_robots), 2))    # all robots positions in game coordinate system
+        self._update_positions()
 
         self.ball = ball_model(0, 0)
 
@@ -40,6 +44,7 @@ class GameSimulator:
         :return:
         """
         other_players_actions = []
+        self._update_positions()
         for team in range(self._number_of_teams):
             for player_id in range(self._number_of_robots):
                 action = actions_per_team_per_player[team][player_id]
@@ -51,6 +56,8 @@ class GameSimulator:
                         other_players_actions.append((self._robots[team][player_id], other_action))
                 else:
                     self._robots[team][player_id].collision_step(*collisions, *action)
+                self._positions[team * self._number_of_robots + player_id] = \
+                    self._robots[team][player_id].get_position_components_wcs()
 
         ball_any_collision, *ball_collisions = self.check_ball_collisions()
         if ball_any_collision:
@@ -59,6 +66,14 @@ class GameSimulator:
             self.ball.players_actions(other_players_actions)
         self.ball.step()
 
+    def _update_positions(self):
+        """
+        Copy all robots positions to the array used for the vectorized collision checks
+        :return:
+        """
+        for i, robot in enumerate(self._all_robots):
+            self._positions[i] = robot.get_position_components_wcs()
+
     def get_positions_for_visualizer(self):
         """
         Get simulation state to update visualizer,
@@ -166,16 +181,12 @@ class GameSimulator:
         safe_collision_threshold = 1.2  # FIXME
         #p_x, p_y = player.get_position_components_wcs()
         R = R + self._robots[0][0].radius  * safe_collision_threshold
-        collisions_list = []
 
-        for team in range(self._number_of_teams):
-            for player_id in range(self._number_of_robots):
-                if team == this_team_id and player_id == this_player_id:
-                    continue
-                o_x, o_y = self._robots[team][player_id].get_position_components_wcs()
-                collision = np.hypot(p_x - o_x, p_y - o_y) <= R
-                if collision:
-                    collisions_list.append(self._robots[team][player_id]) #(team, player_id))
+        # distances to all players at once, the positions are kept up to date by step
+        in_collision = np.hypot(p_x - self._positions[:, 0], p_y - self._positions[:, 1]) <= R
+        if this_team_id >= 0 and this_player_id >= 0:
+            in_collision[this_team_id * self._number_of_robots + this_player_id] = False
+        collisions_list = [self._all_robots[i] for i in np.flatnonzero(in_collision)]
         collision = CollisionTypes.PLAYER if len(collisions_list) else CollisionTypes.NO
         return collision, collisions_list
 
@@ -1,15 +1,38 @@
 from abc import ABC, abstractmethod
+import math
 import numpy as np
 from GameEngine.ball_model import BallActions
 import matplotlib.pyplot as plt
 from GameEngine.collisions import CollisionTypes
+from GameEngine._robot_kernels import restricted_speeds_kernel, step_kernel, step_n_kernel
+from GameEngine._robot_kernels import PI, HALF_PI, QUARTER_PI, THREE_QUARTER_PI
+try:
+    # compiled kernels, see setup.py - the numba/python kernels above are used when they are not built
+    from GameEngine._robot_physics import restricted_speeds_kernel, step_kernel, step_n_kernel, step_all as _step_all
+except ImportError:
+    _step_all = None
+
+# (wall collision type, x sign, y sign) -> (blocker angle, restricted angle), position signs in EFCS
+_WALL_LUT = {}
+for _sx in (1, -1):
+    for _sy in (1, -1):
+        _WALL_LUT[(CollisionTypes.WALL_VERTICAL, _sx, _sy)] = (0 if _sx > 0 else -PI, HALF_PI)
+        _WALL_LUT[(CollisionTypes.WALL_HORIZONTAL, _sx, _sy)] = (_sy * HALF_PI, HALF_PI)
+        _WALL_LUT[(CollisionTypes.WALL_CORNER, _sx, _sy)] = (_sy * (QUARTER_PI if _sx > 0 else THREE_QUARTER_PI),
+                                                              THREE_QUARTER_PI)
 
 
 class RobotModel(ABC):
+    __slots__ = ('_dt', 'pointing_angle', 'vel', 'vel_limit', '_cord_system_rot', '_cs_sign', '_x_pos_EFCS',
+                 '_y_pos_EFCS', 'radius', '_wheel_radius', '_axis_len', '_k_vel', '_k_lin', '_k_ang', '_x_wall',
+                 '_y_wall')
+
     @abstractmethod
-    def __init__(self, init_x_pos: float, init_y_pos: float, dt: float = 0.1, robot_radius: float = 0.1, wheel_radius: float = 0.02, cord_system_rot: float = 0, axis_len: float = 0.05):
+    def __init__(self, init_x_pos: float, init_y_pos: float, dt: float = 0.1, robot_radius: float = 0.1, wheel_radius: float = 0.02, cord_system_rot: float = 0, axis_len: float = 0.05,
+                 size_of_field: tuple = (10, 6)):
         """
         :param dt: simulation time step
+        :param size_of_field: field length and width, the field is centred at the origin
         """
         self._dt = dt                                       # simulation time step
         self.pointing_angle = 0                             # robot pointing direction, range <-pi, pi>
@@ -21,12 +44,23 @@ class RobotModel(ABC):
         # positive Y 90deg rotated counterclockwise from X axis
         # pointing angle [rad], 0rad with X axis, positive towards the Y axis (counterclockwise)
         self._cord_system_rot = cord_system_rot  # team coordinate system (EFCS) rotation in respect to game CS
+        if cord_system_rot == 0:
+            self._cs_sign = 1                               # EFCS <-> game CS conversion
+        elif cord_system_rot == PI:
+            self._cs_sign = -1
+        else:
+            raise ValueError("The coordinate system rotation not defined correctly")
         x_init, y_init = self._convert_field_CS_to_EFCS(init_x_pos, init_y_pos)
         self._x_pos_EFCS = x_init                           # robot x coordinate in field coordinate system
         self._y_pos_EFCS = y_init                           # robot x coordinate in field coordinate system
         self.radius = robot_radius                          # assuming round robot
         self._wheel_radius = wheel_radius                   # wheel_radius
         self._axis_len = axis_len                           # distance between wheels
+        self._k_vel = wheel_radius * 0.5                    # velocity per motor speed sum
+        self._k_lin = wheel_radius * dt * 0.5               # travelled distance per motor speed sum
+        self._k_ang = wheel_radius * dt / axis_len          # rotation per motor speed difference
+        self._x_wall = (-size_of_field[0] / 2, size_of_field[0] / 2)    # walls x coordinates, same in EFCS
+        self._y_wall = (-size_of_field[1] / 2, size_of_field[1] / 2)    # walls y coordinates, same in EFCS
 
         #self.last_collision_object = None
         #self.steps_since_last_collision = 1000
@@ -38,12 +72,7 @@ class RobotModel(ABC):
         :param pos_y:
         :return:
         """
-        if self._cord_system_rot == 0:
-            return pos_x, pos_y
-        elif self._cord_system_rot == np.pi:
-            return -pos_x, -pos_y
-        else:
-            raise ValueError("The coordinate system rotation not defined correctly")
+        return pos_x * self._cs_sign, pos_y * self._cs_sign
 
     def _convert_EFCS_to_field_CS(self, pos_x: float, pos_y: float) -> (float, float):
         """
@@ -52,12 +81,7 @@ class RobotModel(ABC):
         :param pos_y:
         :return:
         """
-        if self._cord_system_rot == 0:
-            return pos_x, pos_y
-        elif self._cord_system_rot == np.pi:
-            return -pos_x, -pos_y
-        else:
-            raise ValueError("The coordinate system rotation not defined correctly")
+        return pos_x * self._cs_sign, pos_y * self._cs_sign
 
     @abstractmethod
     def step(self, l_motor_speed: float, r_motor_speed: float, extra_action: BallActions = BallActions.NO) -> BallActions:
@@ -81,8 +105,8 @@ class RobotModel(ABC):
         Return the velocity vector (x, y components) in game coordinate system
         :return: x velocity, y velocity
         """
-        return self._convert_EFCS_to_field_CS(self.vel * np.cos(self.pointing_angle),
-                                              self.vel * np.sin(self.pointing_angle))
+        return self._convert_EFCS_to_field_CS(self.vel * math.cos(self.pointing_angle),
+                                              self.vel * math.sin(self.pointing_angle))
 
     def get_position_components_wcs(self) -> (float, float):
         """
@@ -93,6 +117,7 @@ class RobotModel(ABC):
 
 
 class RobotBasicModel(RobotModel):
+    __slots__ = ()
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -106,15 +131,23 @@ class RobotBasicModel(RobotModel):
         :return:
         """
 
-        # http://roboscience.org/book/html/Simulation/MovingDifferential.html
-        self.vel = (self._wheel_radius / 2.0) * (l_motor_speed + r_motor_speed)
-        xn = self._x_pos_EFCS + (self._wheel_radius * self._dt / 2.0) * (l_motor_speed + r_motor_speed) * np.cos(self.pointing_angle)
-        yn = self._y_pos_EFCS + (self._wheel_radius * self._dt / 2.0) * (l_motor_speed + r_motor_speed) * np.sin(self.pointing_angle)
-        qn = self.pointing_angle + (self._wheel_radius * self._dt / (self._axis_len)) * (l_motor_speed - r_motor_speed)
-        clip_angle = lambda a: a - 2*np.pi*np.sign(a) if abs(a) > np.pi else a
-        self._x_pos_EFCS, self._y_pos_EFCS, self.pointing_angle = xn, yn, clip_angle(qn)
+        self._x_pos_EFCS, self._y_pos_EFCS, self.pointing_angle, self.vel = step_kernel(
+            self._x_pos_EFCS, self._y_pos_EFCS, self.pointing_angle, l_motor_speed, r_motor_speed,
+            self._k_vel, self._k_lin, self._k_ang)
         return extra_action
 
+    def step_n(self, l_motor_speed: float, r_motor_speed: float, steps: int):
+        """
+        Execute several simulation steps with constant motor speeds, without collision handling
+        :param l_motor_speed: <rad/s> left motor rotation speed
+        :param r_motor_speed: <rad/s> right motor rotation speed
+        :param steps: number of simulation steps
+        :return:
+        """
+        self._x_pos_EFCS, self._y_pos_EFCS, self.pointing_angle, self.vel = step_n_kernel(
+            self._x_pos_EFCS, self._y_pos_EFCS, self.pointing_angle, l_motor_speed, r_motor_speed,
+            self._k_vel, self._k_lin, self._k_ang, steps)
+
     def collision_step(self, wall_collision:CollisionTypes, players_collision: CollisionTypes, collision_list: list,
                        l_motor_speed: float, r_motor_speed: float, extra_action: BallActions = BallActions.NO):
         """
@@ -126,25 +159,17 @@ class RobotBasicModel(RobotModel):
             other_pos_x, other_pos_y = collision_object.get_position_components_wcs()
             self_pos_x, self_pos_y = self.get_position_components_wcs()
             diff_x, diff_y = self_pos_x - other_pos_x, self_pos_y - other_pos_y
-            blocker_angle = np.arctan2(diff_y, diff_x)
-            restricted_angle = np.pi / 2
+            blocker_angle = math.atan2(diff_y, diff_x)
+            restricted_angle = HALF_PI
 
         elif wall_collision != CollisionTypes.NO:
-            if wall_collision == CollisionTypes.WALL_VERTICAL:
-                if self._x_pos_EFCS > 0: blocker_angle, restricted_angle = 0, np.pi / 2
-                else: blocker_angle, restricted_angle = -np.pi, np.pi/2
-                self._x_pos_EFCS = np.round(self._x_pos_EFCS)
-            elif wall_collision == CollisionTypes.WALL_HORIZONTAL:
-                if self._y_pos_EFCS > 0: blocker_angle, restricted_angle = np.pi/2, np.pi / 2
-                else: blocker_angle, restricted_angle = -np.pi/2, np.pi/2
-                self._y_pos_EFCS = np.round(self._y_pos_EFCS)
-            else:
-                if self._x_pos_EFCS > 0 and self._y_pos_EFCS > 0: blocker_angle, restricted_angle = np.pi/4, 3*np.pi/4
-                elif self._x_pos_EFCS > 0 and self._y_pos_EFCS < 0: blocker_angle, restricted_angle = -np.pi/4, 3*np.pi/4
-                elif self._x_pos_EFCS < 0 and self._y_pos_EFCS > 0: blocker_angle, restricted_angle = 3*np.pi/4, 3*np.pi/4
-                else: blocker_angle, restricted_angle = -3*np.pi/4, 3*np.pi/4
-                self._x_pos_EFCS = np.round(self._x_pos_EFCS)
-                self._y_pos_EFCS = np.round(self._y_pos_EFCS)
+            sign_x = 1 if self._x_pos_EFCS > 0 else -1
+            sign_y = 1 if self._y_pos_EFCS > 0 else -1
+            blocker_angle, restricted_angle = _WALL_LUT[(wall_collision, sign_x, sign_y)]
+            if wall_collision != CollisionTypes.WALL_HORIZONTAL:  # move back onto the wall
+                self._x_pos_EFCS = self._x_wall[1] if sign_x > 0 else self._x_wall[0]
+            if wall_collision != CollisionTypes.WALL_VERTICAL:
+                self._y_pos_EFCS = self._y_wall[1] if sign_y > 0 else self._y_wall[0]
         else:
             raise ValueError
         self.step_with_restrictions(blocker_angle, restricted_angle, l_motor_speed, r_motor_speed)
@@ -152,32 +177,134 @@ class RobotBasicModel(RobotModel):
 
     def step_with_restrictions(self, angle_of_blockage_relative_to_ego, restricted_angle,
                                l_motor_speed: float, r_motor_speed: float):
-        get_diff_angle = lambda a, b: abs((a - b + np.pi) % (2 * np.pi) - np.pi)
-        clip_angle = lambda a: a - 2 * np.pi * np.sign(a) if abs(a) > np.pi else a
-        vel_simplified = (l_motor_speed + r_motor_speed) / 2
-
-        if vel_simplified == 0:
-            self.step(l_motor_speed, r_motor_speed)
-        elif vel_simplified > 0:
-            angle_diff = get_diff_angle(angle_of_blockage_relative_to_ego, self.pointing_angle)
-            if angle_diff > restricted_angle:
-                self.step(l_motor_speed, r_motor_speed)
-            else:
-                self.step(l_motor_speed - vel_simplified, r_motor_speed - vel_simplified)
-        elif vel_simplified < 0:
-            move_pointing_ang = clip_angle(self.pointing_angle + np.pi)
-            angle_diff = get_diff_angle(angle_of_blockage_relative_to_ego, move_pointing_ang)
-            if angle_diff > restricted_angle:
-                self.step(l_motor_speed, r_motor_speed)
-            else:
-                self.step(l_motor_speed - vel_simplified, r_motor_speed - vel_simplified)
+        self.step(*restricted_speeds_kernel(self.pointing_angle, angle_of_blockage_relative_to_ego, restricted_angle,
+                                            l_motor_speed, r_motor_speed))
+
+
+def _aligned_empty(size: int, dtype=np.float32, alignment: int = 64) -> np.ndarray:
+    """
+    Uninitialised array with the data aligned for SIMD loads
+    :param size: number of elements
+    :param alignment: alignment of the first element in bytes
+    :return:
+    """
+    itemsize = np.dtype(dtype).itemsize
+    buffer = np.empty(size * itemsize + alignment, dtype=np.uint8)
+    offset = -buffer.ctypes.data % alignment
+    return buffer[offset:offset + size * itemsize].view(dtype)
+
+
+class RobotFleet:
+    def __init__(self, init_x_pos, init_y_pos, dt: float = 0.1, robot_radius: float = 0.1, wheel_radius: float = 0.02,
+                 cord_system_rot=0, axis_len: float = 0.05):
+        """
+        Many robots sharing the same physical parameters, the state is kept as structure of arrays (one array per
+        state component) so all robots are stepped with a few vectorized operations
+        :param init_x_pos: robots x coordinates in game coordinate system
+        :param init_y_pos: robots y coordinates in game coordinate system
+        :param dt: simulation time step
+        :param cord_system_rot: team coordinate system (EFCS) rotation in respect to game CS - scalar or per robot
+        """
+        x_init = np.array(init_x_pos, dtype=np.float32).ravel()
+        y_init = np.array(init_y_pos, dtype=np.float32).ravel()
+        if x_init.shape != y_init.shape:
+            raise ValueError("The x and y coordinates of the robots do not match")
+        cord_system_rot = np.broadcast_to(np.asarray(cord_system_rot, dtype=np.float64), x_init.shape)
+        if not np.all((cord_system_rot == 0) | (cord_system_rot == np.pi)):
+            raise ValueError("The coordinate system rotation not defined correctly")
+        self._cs_sign = np.where(cord_system_rot == 0, 1, -1).astype(np.float32)  # EFCS <-> game CS conversion
+
+        self._dt = dt                                       # simulation time step
+        self.x = _aligned_empty(x_init.shape[0])            # robots x coordinates in EFCS
+        self.y = _aligned_empty(x_init.shape[0])            # robots y coordinates in EFCS
+        self.q = _aligned_empty(x_init.shape[0])            # robots pointing direction, range <-pi, pi>
+        self.vel = _aligned_empty(x_init.shape[0])          # robots velocity
+        np.multiply(x_init, self._cs_sign, out=self.x)
+        np.multiply(y_init, self._cs_sign, out=self.y)
+        self.q[:] = 0
+        self.vel[:] = 0
+        self.radius = robot_radius                          # assuming round robots
+        self._wheel_radius = wheel_radius                   # wheel_radius
+        self._axis_len = axis_len                           # distance between wheels
+        self._k_vel = wheel_radius * 0.5                    # velocity per motor speed sum
+        self._k_lin = wheel_radius * dt * 0.5               # travelled distance per motor speed sum
+        self._k_ang = wheel_radius * dt / axis_len          # rotation per motor speed difference
+        self._q_tmp = _aligned_empty(x_init.shape[0])       # buffer for the angle wrapping
+
+    @classmethod
+    def from_robots(cls, robots: list):
+        """
+        Build the fleet from already existing robots, the parameters of the first robot are used for the whole fleet
+        :param robots: list of RobotBasicModel
+        :return:
+        """
+        robot = robots[0]
+        positions = np.array([r.get_position_components_wcs() for r in robots], dtype=np.float64).reshape(-1, 2)
+        fleet = cls(positions[:, 0], positions[:, 1], dt=robot._dt, robot_radius=robot.radius,
+                    wheel_radius=robot._wheel_radius, cord_system_rot=[r._cord_system_rot for r in robots],
+                    axis_len=robot._axis_len)
+        fleet.q[:] = [r.pointing_angle for r in robots]
+        fleet.vel[:] = [r.vel for r in robots]
+        return fleet
+
+    def __len__(self):
+        return self.x.shape[0]
+
+    def step_batch(self, l_motor_speed, r_motor_speed):
+        """
+        Execute simulation step for all robots, same differential drive model as RobotBasicModel.step
+        :param l_motor_speed: <rad/s> left motors rotation speed, scalar or per robot
+        :param r_motor_speed: <rad/s> right motors rotation speed, scalar or per robot
+        :return:
+        """
+        l_motor_speed = np.asarray(l_motor_speed, dtype=np.float32)
+        r_motor_speed = np.asarray(r_motor_speed, dtype=np.float32)
+        if _step_all is not None:
+            _step_all(self.x, self.y, self.q, self.vel,
+                      np.ascontiguousarray(np.broadcast_to(l_motor_speed, self.x.shape)),
+                      np.ascontiguousarray(np.broadcast_to(r_motor_speed, self.x.shape)),
+                      self._k_vel, self._k_lin, self._k_ang)
+            return
+        speed_sum = l_motor_speed + r_motor_speed
+        self.vel[:] = self._k_vel * speed_sum
+        k = self._k_lin * speed_sum
+        np.add(self.x, k * np.cos(self.q), out=self.x)
+        np.add(self.y, k * np.sin(self.q), out=self.y)
+        np.add(self.q, self._k_ang * (l_motor_speed - r_motor_speed), out=self.q)
+        if np.abs(self.q, out=self._q_tmp).max(initial=0) < np.pi:  # all angles still in range, skip the wrap
+            return
+        np.add(self.q, np.pi, out=self._q_tmp)           # wrap to <-pi, pi)
+        np.mod(self._q_tmp, 2 * np.pi, out=self._q_tmp)
+        np.subtract(self._q_tmp, np.pi, out=self.q)
+
+    def get_position_components_wcs(self, index: int) -> (float, float):
+        sign = self._cs_sign[index]
+        return float(self.x[index] * sign), float(self.y[index] * sign)
+
+    def get_positions_wcs(self):
+        """
+        :return: x, y arrays of all robots positions in game coordinate system
+        """
+        return self.x * self._cs_sign, self.y * self._cs_sign
+
+    def get_velocities_wcs(self):
+        """
+        :return: x, y arrays of all robots velocity components in game coordinate system
+        """
+        vel = self.vel * self._cs_sign
+        return vel * np.cos(self.q), vel * np.sin(self.q)
 
 
 class RobotModelTests:
+    _fig, _axes = None, None                            # figure reused by t_plot
 
     @staticmethod
     def t_plot(history):
-        f, (ax1, ax2, ax3) = plt.subplots(3, 1)
+        if RobotModelTests._fig is None or not plt.fignum_exists(RobotModelTests._fig.number):
+            RobotModelTests._fig, RobotModelTests._axes = plt.subplots(3, 1)
+        ax1, ax2, ax3 = RobotModelTests._axes
+        for ax in RobotModelTests._axes:
+            ax.cla()
         ax1.plot(history['x'], history['y'], label='pos')
         ax1.set_xlabel('x'), ax1.set_xlabel('y')
         ax1.legend()
@@ -189,26 +316,22 @@ class RobotModelTests:
         ax3.plot(history['t'], history['dy'], label='y_vel(t)')
         ax3.set_xlabel('t'), ax1.set_xlabel('x & y')
         ax3.legend()
+        RobotModelTests._fig.canvas.draw_idle()
 
     @staticmethod
-    def add_history(history, t, x, y, dx, dy):
-        history['x'].append(x)
-        history['y'].append(y)
-        history['t'].append(t)
-        history['dx'].append(dx)
-        history['dy'].append(dy)
+    def new_history(steps):
+        return {key: np.empty(steps, dtype=np.float32) for key in ('x', 'y', 'dx', 'dy', 't')}
 
     @staticmethod
     def test_stationary(x=0, y=0, time=100):
         robot = RobotBasicModel(x,y)
-        history = {'x': [], 'y': [], 'dx': [], 'dy': [], 't': []}
+        steps = int(time / robot._dt)
+        history = RobotModelTests.new_history(steps)
 
-        for i in range(int(time / robot._dt)):
+        for i in range(steps):
             robot.step(0,0)
-            x, y = robot.get_position_components_wcs()
-            history['x'].append(x)
-            history['y'].append(y)
-            history['t'].append(i)
+            history['x'][i], history['y'][i] = robot.get_position_components_wcs()
+            history['t'][i] = i
         plt.plot(history['t'], history['x'], label='x_pos')
         plt.plot(history['t'], history['y'], label='y_pos')
         return True
@@ -216,13 +339,14 @@ class RobotModelTests:
     @staticmethod
     def test_moving_forward(direction=1, x=0, y=0, dq=5, time=100):
         robot = RobotBasicModel(x, y)
-        history = {'x': [], 'y': [], 'dx': [], 'dy': [], 't': []}
+        steps = int(time / robot._dt)
+        history = RobotModelTests.new_history(steps)
 
-        for i in range(int(time / robot._dt)):
+        for i in range(steps):
             robot.step(direction * dq, direction * dq)
-            x, y = robot.get_position_components_wcs()
-            dx, dy = robot.get_velocity_components_wcs()
-            RobotModelTests.add_history(history, i * robot._dt, x, y, dx, dy)
+            history['x'][i], history['y'][i] = robot.get_position_components_wcs()
+            history['dx'][i], history['dy'][i] = robot.get_velocity_components_wcs()
+            history['t'][i] = i * robot._dt
 
         RobotModelTests.t_plot(history)
         return True
@@ -230,13 +354,14 @@ class RobotModelTests:
     @staticmethod
     def test_moving_round(speed_l=5, speed_r=4, x=0, y=0, time=100):
         robot = RobotBasicModel(x, y)
-        history = {'x': [], 'y': [], 'dx': [], 'dy': [], 't': []}
+        steps = int(time / robot._dt)
+        history = RobotModelTests.new_history(steps)
 
-        for i in range(int(time / robot._dt)):
+        for i in range(steps):
             robot.step(speed_l, speed_r)
-            x, y = robot.get_position_components_wcs()
-            dx, dy = robot.get_velocity_components_wcs()
-            RobotModelTests.add_history(history, i * robot._dt, x, y, dx, dy)
+            history['x'][i], history['y'][i] = robot.get_position_components_wcs()
+            history['dx'][i], history['dy'][i] = robot.get_velocity_components_wcs()
+            history['t'][i] = i * robot._dt
 
         RobotModelTests.t_plot(history)
         return True
@@ -244,17 +369,49 @@ class RobotModelTests:
     @staticmethod
     def test_rotation(speed=5, x=0, y=0, time=5):
         robot = RobotBasicModel(x, y)
-        history = {'x': [], 'y': [], 'dx': [], 'dy': [], 't': []}
+        steps = int(time / robot._dt)
+        history = RobotModelTests.new_history(steps)
 
-        for i in range(int(time / robot._dt)):
+        for i in range(steps):
             robot.step(speed, -speed)
-            x, y = robot.get_position_components_wcs()
-            dx, dy = robot.get_velocity_components_wcs()
-            RobotModelTests.add_history(history, i * robot._dt, x, y, dx, dy)
+            history['x'][i], history['y'][i] = robot.get_position_components_wcs()
+            history['dx'][i], history['dy'][i] = robot.get_velocity_components_wcs()
+            history['t'][i] = i * robot._dt
 
         RobotModelTests.t_plot(history)
         return True
 
+    @staticmethod
+    def test_step_n_matches_step(speed_l=5, speed_r=-4, time=10):
+        robot, robot_n = RobotBasicModel(1, -1, cord_system_rot=np.pi), RobotBasicModel(1, -1, cord_system_rot=np.pi)
+        steps = int(time / robot._dt)
+        for i in range(steps):
+            robot.step(speed_l, speed_r)
+        robot_n.step_n(speed_l, speed_r, steps)
+        assert np.allclose(robot_n.get_position_components_wcs(), robot.get_position_components_wcs())
+        assert np.allclose(robot_n.get_velocity_components_wcs(), robot.get_velocity_components_wcs())
+        assert np.isclose(robot_n.pointing_angle, robot.pointing_angle)
+        return True
+
+    @staticmethod
+    def test_fleet_matches_single_robot(time=10):
+        init_states = [(0, 0, 0, 5, 4), (-4, 2, 0, 1, 1), (2, -1, np.pi, -3, 2), (1, 1, np.pi, 5, -5)]
+        robots = [RobotBasicModel(x, y, cord_system_rot=rot) for x, y, rot, _, _ in init_states]
+        fleet = RobotFleet.from_robots(robots)
+        l_speeds = np.array([state[3] for state in init_states])
+        r_speeds = np.array([state[4] for state in init_states])
+
+        for i in range(int(time / fleet._dt)):
+            fleet.step_batch(l_speeds, r_speeds)
+            for robot, l_speed, r_speed in zip(robots, l_speeds, r_speeds):
+                robot.step(l_speed, r_speed)
+        fleet_x, fleet_y = fleet.get_positions_wcs()
+        fleet_dx, fleet_dy = fleet.get_velocities_wcs()
+        for i, robot in enumerate(robots):
+            assert np.allclose((fleet_x[i], fleet_y[i]), robot.get_position_components_wcs(), atol=1e-3)
+            assert np.allclose((fleet_dx[i], fleet_dy[i]), robot.get_velocity_components_wcs(), atol=1e-3)
+        return True
+
     @staticmethod
     def test_coordinate_frame_conversion():
         pass
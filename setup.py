@@ -0,0 +1,17 @@
+"""
+Build the optional compiled simulation kernels: python setup.py build_ext --inplace
+The python implementation is used when the extensions are not built
+"""
+from setuptools import setup
+from setuptools.extension import Extension
+from Cython.Build import cythonize
+
+extensions = [
+    Extension("GameEngine.ball_model_c", ["GameEngine/ball_model_c.pyx"], extra_compile_args=["-O3", "-ffast-math"]),
+    Extension("GameEngine._robot_physics", ["GameEngine/_robot_physics.pyx"], extra_compile_args=["-O3", "-ffast-math"]),
+]
+
+setup(
+    name="UofG_Robotics_TDP",
+    ext_modules=cythonize(extensions, compiler_directives={"language_level": "3"}),
+)